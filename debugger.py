@@ -1,21 +1,58 @@
 from __future__ import annotations
 
 import sys
+import threading
+import time
 import warnings
 from typing import Dict, Any
 
-from PyQt5.QtCore import Qt, QTimer, QRect
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout,
+import numpy as np
+from PyQt5.QtCore import Qt, QTimer, QRect, QPointF, QEvent, QThread, pyqtSignal
+from PyQt5.QtGui import (QIcon, QPainter, QColor, QPen, QBrush, QTextCharFormat, QTextCursor, QImage,
+                         QStaticText, QTransform)
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget,
                              QLineEdit, QSpinBox, QHBoxLayout, QVBoxLayout,
                              QLabel, QGroupBox, QPushButton, QListWidget, QSizePolicy, QAction, QFileDialog,
-                             QMessageBox, QDialog)
+                             QMessageBox, QDialog, QTextEdit, QFrame)
 
 from deolang.gridmap import GridMap
 from deolang.interpreter import Interpreter
+from deolang.run_loop import (STOP_DONE, STOP_INPUT_EXHAUSTED, STOP_NEEDS_INPUT, STOP_NO_CHARACTER,
+                              STOP_STACK_UNDERFLOW, run_batch)
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
+CELL_SIZE = 20
+FRAME_INTERVAL = 16
+MAX_RUN_STEPS = 1000000
+RESIZE_DEBOUNCE_INTERVAL = 150
+STATUS_MESSAGE_TIMEOUT = 2000
+GRID_LINE_COLOR = "#A0A0A0"
+
+
+def read_interpreter_state(interpreter, previous=None):
+    """Copy the interpreter fields shown by the debugger.
+
+    The output is only decoded again if it grew since the previous state, the
+    current character is not looked up at all.
+    """
+    output_length = len(interpreter.output)
+    if previous and previous["output_length"] == output_length:
+        output = previous["output"]
+    else:
+        output = interpreter.get_output()
+    return {
+        "output": output,
+        "output_length": output_length,
+        "stack": list(interpreter.stack),
+        "addition_stack": list(interpreter.addition_stack),
+        "position": (interpreter.x, interpreter.y),
+        "direction": interpreter.direction,
+        "ignore_mode": interpreter.ignore_mode,
+        "input": interpreter.input,
+        "input_pointer": interpreter.input_pointer,
+    }
+
 
 class ColorDialog(QDialog):
     def __init__(self, parent=None, colors=None):
@@ -30,22 +67,18 @@ class ColorDialog(QDialog):
         layout2 = QVBoxLayout()
         layout1.addWidget(QLabel("Pointer outline color:"))
         self.pointer_outline_color_input = QLineEdit()
-        self.pointer_outline_color_input.setText(colors[0])
         layout2.addWidget(self.pointer_outline_color_input)
 
         layout1.addWidget(QLabel("Pointer fill color:"))
         self.pointer_fill_color_input = QLineEdit()
-        self.pointer_fill_color_input.setText(colors[1])
         layout2.addWidget(self.pointer_fill_color_input)
 
         layout1.addWidget(QLabel("Cursor outline color:"))
         self.cursor_outline_color_input = QLineEdit()
-        self.cursor_outline_color_input.setText(colors[2])
         layout2.addWidget(self.cursor_outline_color_input)
 
         layout1.addWidget(QLabel("Cursor fill color:"))
         self.cursor_fill_color_input = QLineEdit()
-        self.cursor_fill_color_input.setText(colors[3])
         layout2.addWidget(self.cursor_fill_color_input)
 
         self.temp_layout = QHBoxLayout()
@@ -65,6 +98,13 @@ class ColorDialog(QDialog):
         self.layout.addLayout(button_layout)
 
         self.setLayout(self.layout)
+        self.set_values(colors)
+
+    def set_values(self, colors):
+        self.pointer_outline_color_input.setText(colors[0])
+        self.pointer_fill_color_input.setText(colors[1])
+        self.cursor_outline_color_input.setText(colors[2])
+        self.cursor_fill_color_input.setText(colors[3])
 
     def get_values(self):
         return (
@@ -86,7 +126,6 @@ class InputDialog(QDialog):
         self.layout.addWidget(QLabel("Input:"), alignment=Qt.AlignLeft)
 
         self.input_box = QLineEdit()
-        self.input_box.setText(input_text)
         self.layout.addWidget(self.input_box)
 
         self.button_layout = QHBoxLayout()
@@ -99,104 +138,188 @@ class InputDialog(QDialog):
         self.cancel_button.clicked.connect(self.reject)
 
         self.setLayout(self.layout)
+        self.set_value(input_text)
+
+    def set_value(self, input_text):
+        self.input_box.setText(input_text)
 
 
 class CellGrid(QWidget):
+    _DIRS = {
+        Qt.Key_Up: (-1, 0),
+        Qt.Key_Down: (1, 0),
+        Qt.Key_Left: (0, -1),
+        Qt.Key_Right: (0, 1)
+    }
+
     def __init__(self, rows, cols):
         super().__init__()
-        self.cells = []
+        self._cursor_css = ""
+        self._dirty = set()
+        self._edit_state = None
+        self._grid_image = None
+        self._grid_pen = QPen(QColor(GRID_LINE_COLOR))
+        self._pointer_brush = None
+        self._pointer_ignore_brush = QBrush(QColor("#ffffff"))
+        self._pointer_pen = None
+        self._static_texts = {}
         self.cols = cols
         self.current_col = 0
         self.current_row = 0
+        self.data = np.full((rows, cols), '', dtype='U1')
+        self.focus_edit = None
         self.highlight_col = 0
         self.highlight_row = 0
+        self.ignore_mode = False
         self.rows = rows
         self.pointer_outline_color = "#0000FF"
         self.pointer_fill_color = "#ADD8E6"
         self.cursor_outline_color = "#000000"
         self.cursor_fill_color = "#90EE90"
         self.init_ui()
+        self.update_colors((self.pointer_outline_color, self.pointer_fill_color,
+                            self.cursor_outline_color, self.cursor_fill_color))
 
     def init_ui(self):
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(1)
-
-        self.cells = []
-        for row in range(self.rows):
-            row_cells = []
-            for col in range(self.cols):
-                cell = QLineEdit()
-                cell.setMaxLength(1)
-                cell.setAlignment(Qt.AlignCenter)
-                cell.setFixedSize(20, 20)
-                grid_layout.addWidget(cell, row, col)
-                row_cells.append(cell)
-                cell.keyPressEvent = lambda event, r=row, c=col: self.cell_key_press_event(event, r, c)
-                cell.mousePressEvent = lambda event, r=row, c=col: self.set_current_cell(r, c)
-            self.cells.append(row_cells)
-
-        self.setLayout(grid_layout)
+        self.focus_edit = QLineEdit(self)
+        self.focus_edit.setMaxLength(1)
+        self.focus_edit.setAlignment(Qt.AlignCenter)
+        self.focus_edit.setFixedSize(CELL_SIZE, CELL_SIZE)
+        self.focus_edit.textEdited.connect(self.on_cell_edited)
+        self.focus_edit.installEventFilter(self)
+
+        self.setFixedSize(self.cols * CELL_SIZE + 1, self.rows * CELL_SIZE + 1)
+        self.build_grid_image()
         self.update_highlights(ignore_mode=False)
 
     def set_grid_size(self, rows, cols):
-        old_data = []
-        for r in range(min(rows, self.rows)):
-            row_data = []
-            for c in range(min(cols, self.cols)):
-                row_data.append(self.cells[r][c].text())
-            old_data.append(row_data)
+        if (rows, cols) == (self.rows, self.cols):
+            return
 
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.cells[r][c].setParent(None)
+        data = np.full((rows, cols), '', dtype='U1')
+        keep_rows, keep_cols = min(rows, self.rows), min(cols, self.cols)
+        data[:keep_rows, :keep_cols] = self.data[:keep_rows, :keep_cols]
 
+        self.data = data
         self.rows = rows
         self.cols = cols
-        self.cells = []
 
         self.current_row = min(self.current_row, rows - 1)
         self.current_col = min(self.current_col, cols - 1)
         self.highlight_row = min(self.highlight_row, rows - 1)
         self.highlight_col = min(self.highlight_col, cols - 1)
 
-        grid_layout = self.layout()
-        for row in range(rows):
-            row_cells = []
-            for col in range(cols):
-                cell = QLineEdit()
-                cell.setMaxLength(1)
-                cell.setAlignment(Qt.AlignCenter)
-                cell.setFixedSize(20, 20)
-                grid_layout.addWidget(cell, row, col)
-                row_cells.append(cell)
-
-                if row < len(old_data) and col < len(old_data[row]):
-                    cell.setText(old_data[row][col])
-
-                cell.mousePressEvent = lambda event, r=row, c=col: self.set_current_cell(r, c)
-
-            self.cells.append(row_cells)
-
+        self.setUpdatesEnabled(False)
+        self.setFixedSize(cols * CELL_SIZE + 1, rows * CELL_SIZE + 1)
+        self.build_grid_image()
         self.update_highlights(False)
+        self.setUpdatesEnabled(True)
+        self.update()
+
+    def load(self, data):
+        if data.shape[0] > self.rows or data.shape[1] > self.cols:
+            raise ValueError(f"program is {data.shape[0]}x{data.shape[1]} cells, "
+                             f"the grid only has {self.rows}x{self.cols}")
+        self.data[:data.shape[0], :data.shape[1]] = data
+        self._edit_state = None
+        self.update_highlights(self.ignore_mode)
+        self.update()
+
+    def build_grid_image(self):
+        self._grid_image = QImage(self.size(), QImage.Format_RGB32)
+        self._grid_image.fill(Qt.white)
+        painter = QPainter(self._grid_image)
+        painter.setPen(self._grid_pen)
+        for row in range(self.rows + 1):
+            painter.drawLine(0, row * CELL_SIZE, self.cols * CELL_SIZE, row * CELL_SIZE)
+        for col in range(self.cols + 1):
+            painter.drawLine(col * CELL_SIZE, 0, col * CELL_SIZE, self.rows * CELL_SIZE)
+        painter.end()
+
+    def static_text(self, char):
+        text = self._static_texts.get(char)
+        if text is None:
+            text = QStaticText(char)
+            text.prepare(QTransform(), self.font())
+            self._static_texts[char] = text
+        return text
+
+    def draw_char(self, painter, row, col, char):
+        text = self.static_text(char)
+        size = text.size()
+        painter.drawStaticText(QPointF(col * CELL_SIZE + (CELL_SIZE - size.width()) / 2,
+                                       row * CELL_SIZE + (CELL_SIZE - size.height()) / 2), text)
+
+    def cell_rect(self, row, col):
+        return QRect(col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def update_cell(self, row, col):
+        self.update(self.cell_rect(row, col).adjusted(0, 0, 1, 1))
+
+    def update_colors(self, colors):
+        (self.pointer_outline_color, self.pointer_fill_color,
+         self.cursor_outline_color, self.cursor_fill_color) = colors
+        self._pointer_pen = QPen(QColor(self.pointer_outline_color), 2)
+        self._pointer_brush = QBrush(QColor(self.pointer_fill_color))
+        self._cursor_css = (f"background-color: {self.cursor_fill_color} ; "
+                            f"border: 1px solid {self.cursor_outline_color}")
+        self.focus_edit.setStyleSheet(self._cursor_css)
+        self.update()
+
+    def paintEvent(self, event):
+        rect = event.rect()
+        first_row = max(0, rect.top() // CELL_SIZE)
+        last_row = min(self.rows - 1, rect.bottom() // CELL_SIZE)
+        first_col = max(0, rect.left() // CELL_SIZE)
+        last_col = min(self.cols - 1, rect.right() // CELL_SIZE)
+
+        painter = QPainter(self)
+        painter.drawImage(rect, self._grid_image, rect)
+
+        painter.setPen(Qt.black)
+        visible = self.data[first_row:last_row + 1, first_col:last_col + 1]
+        for row, col in zip(*np.nonzero(visible)):
+            self.draw_char(painter, first_row + row, first_col + col, visible[row, col])
+
+        if ((self.highlight_row != self.current_row or self.highlight_col != self.current_col) and
+                first_row <= self.highlight_row <= last_row and first_col <= self.highlight_col <= last_col):
+            cell_rect = self.cell_rect(self.highlight_row, self.highlight_col)
+            painter.fillRect(cell_rect, self._pointer_ignore_brush if self.ignore_mode else self._pointer_brush)
+            painter.setPen(self._pointer_pen)
+            painter.drawRect(cell_rect.adjusted(1, 1, -1, -1))
+            painter.setPen(Qt.black)
+            char = self.data[self.highlight_row, self.highlight_col]
+            if char:
+                self.draw_char(painter, self.highlight_row, self.highlight_col, char)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        row = event.pos().y() // CELL_SIZE
+        col = event.pos().x() // CELL_SIZE
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self.set_current_cell(row, col)
+
+    def on_cell_edited(self, text):
+        self.data[self.current_row, self.current_col] = text
+        self._edit_state = (self.current_row, self.current_col, text)
+        self.update_cell(self.current_row, self.current_col)
 
     def update_highlights(self, ignore_mode):
-        for r in range(self.rows):
-            for c in range(self.cols):
-                self.cells[r][c].setStyleSheet("")
+        self.ignore_mode = ignore_mode
 
         if self.rows > 0 and self.cols > 0:
-            self.cells[self.current_row][self.current_col].setStyleSheet(
-                f"background-color: {self.cursor_fill_color} ; border: 1px solid {self.cursor_outline_color}")
-            self.cells[self.current_row][self.current_col].setFocus()
-
-        if (self.rows > 0 and self.cols > 0 and
-                (self.highlight_row != self.current_row or self.highlight_col != self.current_col)):
-            if ignore_mode:
-                self.cells[self.highlight_row][self.highlight_col].setStyleSheet(
-                    f"background-color: #ffffff; border: 2px solid {self.pointer_outline_color}")
-            else:
-                self.cells[self.highlight_row][self.highlight_col].setStyleSheet(
-                    f"background-color: {self.pointer_fill_color}; border: 2px solid {self.pointer_outline_color}")
+            edit_state = (self.current_row, self.current_col, self.data[self.current_row, self.current_col])
+            if edit_state != self._edit_state:
+                self._edit_state = edit_state
+                self.focus_edit.setGeometry(self.cell_rect(self.current_row, self.current_col))
+                self.focus_edit.setText(edit_state[2])
+            self.focus_edit.setFocus()
+
+        for row, col in self._dirty:
+            self.update_cell(row, col)
+        self._dirty = {(self.current_row, self.current_col), (self.highlight_row, self.highlight_col)}
+        for row, col in self._dirty:
+            self.update_cell(row, col)
 
     def set_current_cell(self, row, col):
         self.current_row = row
@@ -208,33 +331,90 @@ class CellGrid(QWidget):
         self.highlight_col = col
         self.update_highlights(ignore_mode)
 
-    def get_cell_data(self):
-        return self.cells[self.highlight_row][self.highlight_col].text()
-
-    def cell_key_press_event(self, event, row, col):
-        if event.key() == Qt.Key_Up:
-            self.current_row = max(0, self.current_row - 1)
-            self.update_highlights(False)
-            event.accept()
-        elif event.key() == Qt.Key_Down:
-            self.current_row = min(self.rows - 1, self.current_row + 1)
-            self.update_highlights(False)
-            event.accept()
-        elif event.key() == Qt.Key_Left:
-            self.current_col = max(0, self.current_col - 1)
-            self.update_highlights(False)
-            event.accept()
-        elif event.key() == Qt.Key_Right:
-            self.current_col = min(self.cols - 1, self.current_col + 1)
-            self.update_highlights(False)
-            event.accept()
-        else:
-            QLineEdit.keyPressEvent(self.cells[row][col], event)
+    def get_cell_data(self, row, col):
+        data = self.data
+        if 0 <= row < data.shape[0] and 0 <= col < data.shape[1]:
+            return str(data[row, col])
+        return ""
+
+    def eventFilter(self, obj, event):
+        if obj is self.focus_edit and event.type() == QEvent.KeyPress:
+            return self.cell_key_press_event(event)
+        return super().eventFilter(obj, event)
+
+    def cell_key_press_event(self, event):
+        direction = self._DIRS.get(event.key())
+        if direction is None:
+            return False
+        self.current_row = min(self.rows - 1, max(0, self.current_row + direction[0]))
+        self.current_col = min(self.cols - 1, max(0, self.current_col + direction[1]))
+        self.update_highlights(False)
+        event.accept()
+        return True
+
+
+class InterpreterWorker(QThread):
+    stateUpdated = pyqtSignal(dict)
+    runFinished = pyqtSignal(str)
+
+    def __init__(self, parent, interpreter, grid, lock, first_step, steps, speed):
+        super().__init__(parent)
+        self.executed = first_step
+        self.first_step = first_step
+        self.grid = grid
+        self.interpreter = interpreter
+        self.last_snapshot = None
+        self.lock = lock
+        self.speed = speed
+        self.steps = steps
+
+    def snapshot(self):
+        information = read_interpreter_state(self.interpreter, self.last_snapshot)
+        information["steps_done"] = self.executed
+        self.last_snapshot = information
+        return information
+
+    def get_char(self, x, y):
+        return self.grid.get_cell_data(y, x)
+
+    def run(self):
+        reason = STOP_DONE
+        start = time.monotonic()
+        next_update = start
+        while self.executed < self.steps and not self.isInterruptionRequested():
+            elapsed = time.monotonic() - start
+            due = min(self.steps, self.first_step + int(elapsed * self.speed) + 1)
+            if due <= self.executed:
+                delay = (self.executed - self.first_step) / self.speed - elapsed
+                time.sleep(min(delay, FRAME_INTERVAL / 1000))
+                continue
+
+            with self.lock:
+                executed, reason = run_batch(self.interpreter, self.get_char, due - self.executed,
+                                             stop_on_input=True)
+                self.executed += executed
+                if reason != STOP_DONE:
+                    break
+
+                now = time.monotonic()
+                if now >= next_update:
+                    next_update = now + FRAME_INTERVAL / 1000
+                    self.stateUpdated.emit(self.snapshot())
+
+        with self.lock:
+            self.stateUpdated.emit(self.snapshot())
+        self.runFinished.emit(reason)
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
+        self._info_dirty = False
+        self._input_highlight_format = QTextCharFormat()
+        self._last_info = {}
+        self._last_stack1 = None
+        self._last_stack2 = None
+        self._pending_information = None
         self.color_change_action = None
         self.color_dialog = None
         self.input_dialog = None
@@ -252,10 +432,12 @@ class MainWindow(QMainWindow):
         self.highlight_col = 0
         self.highlight_row = 0
         self.interpreter = Interpreter(build_in_input=self.open_input_dialog)
+        self.interpreter_lock = threading.Lock()
         self.is_running = False
         self.menu_bar = None
         self.open_action = None
         self.reset_button = None
+        self.resize_timer = None
         self.row_spin = None
         self.run_button = None
         self.speed_slider = None
@@ -266,8 +448,7 @@ class MainWindow(QMainWindow):
         self.step_count = None
         self.step_count_total = None
         self.stop_button = None
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.step)
+        self.worker = None
         self.initUI()
 
     def initUI(self):
@@ -310,19 +491,23 @@ class MainWindow(QMainWindow):
         control_panel = QVBoxLayout()
 
         size_group = QGroupBox("Grid Size")
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(RESIZE_DEBOUNCE_INTERVAL)
+        self.resize_timer.timeout.connect(self.resize_grid)
         size_layout = QVBoxLayout()
 
         self.row_spin = QSpinBox()
         self.row_spin.setRange(1, 100)
         self.row_spin.setValue(25)
-        self.row_spin.valueChanged.connect(self.resize_grid)
+        self.row_spin.valueChanged.connect(lambda: self.resize_timer.start())
         size_layout.addWidget(QLabel("Rows:"))
         size_layout.addWidget(self.row_spin)
 
         self.col_spin = QSpinBox()
         self.col_spin.setRange(1, 100)
         self.col_spin.setValue(25)
-        self.col_spin.valueChanged.connect(self.resize_grid)
+        self.col_spin.valueChanged.connect(lambda: self.resize_timer.start())
         size_layout.addWidget(QLabel("Columns:"))
         size_layout.addWidget(self.col_spin)
 
@@ -351,15 +536,25 @@ class MainWindow(QMainWindow):
 
         self.steps_remaining_label = QLabel("      ")
         self.step_count = QSpinBox()
-        self.step_count.setRange(1, 1000)
+        self.step_count.setRange(1, MAX_RUN_STEPS)
         self.speed_slider = QSpinBox()
-        self.speed_slider.setRange(1, 1000)
+        self.speed_slider.setRange(1, MAX_RUN_STEPS)
         self.speed_slider.setFixedWidth(self.step_count.sizeHint().width())
         self.debug_line1 = QLabel("Output: ")
         self.debug_line2 = QLabel("Cords: ")
         self.debug_line3 = QLabel("Direction: ")
         self.debug_line4 = QLabel("Ignore_mode: ")
-        self.debug_line5 = QLabel("input: ")
+        self.debug_line5 = QTextEdit()
+        self.debug_line5.setReadOnly(True)
+        self.debug_line5.setFrameShape(QFrame.NoFrame)
+        self.debug_line5.setLineWrapMode(QTextEdit.NoWrap)
+        self.debug_line5.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.debug_line5.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.debug_line5.setStyleSheet("background: transparent")
+        self.debug_line5.document().setDocumentMargin(0)
+        self.debug_line5.setFixedHeight(self.debug_line4.sizeHint().height())
+        self.debug_line5.setPlainText("input: ")
+        self.update_input_highlight_format()
 
         first_row = QHBoxLayout()
         first_row.addWidget(self.run_button)
@@ -438,78 +633,178 @@ class MainWindow(QMainWindow):
         self.reset()
 
     def run(self):
+        self.stop_worker()
         self.auto_run = True
         self.step_count_total = self.step_count.value()
         self.current_step = 0
         self.is_running = True
-        self.timer.start(1000 // self.speed_slider.value())
+        self.start_worker()
+
+    def start_worker(self):
+        self.worker = InterpreterWorker(self, self.interpreter, self.grid, self.interpreter_lock,
+                                        self.current_step, self.step_count_total, self.speed_slider.value())
+        self.worker.stateUpdated.connect(self.apply_snapshot, Qt.QueuedConnection)
+        self.worker.runFinished.connect(self.on_run_finished, Qt.QueuedConnection)
+        self.worker.start()
+
+    def stop_worker(self):
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.wait()
+            self.worker.deleteLater()
+            self.worker = None
+
+    def apply_snapshot(self, information):
+        if self.worker is None or self.sender() is not self.worker:
+            return
+        self.current_step = information["steps_done"]
+        self.steps_remaining_label.setText(f'Steps left: {self.current_step} / {self.step_count_total}')
+        self.schedule_edit_info(information)
+
+    def on_run_finished(self, reason):
+        if self.worker is None or self.sender() is not self.worker:
+            return
+        self.stop_worker()
+        if reason == STOP_NEEDS_INPUT:
+            if self.execute_step():
+                self.current_step += 1
+                self.steps_remaining_label.setText(
+                    f'Steps left: {self.current_step} / {self.step_count_total}')
+                if self.current_step < self.step_count_total:
+                    self.start_worker()
+                else:
+                    self.stop()
+            self.schedule_edit_info()
+            return
+
+        if reason == STOP_NO_CHARACTER:
+            self.statusBar().showMessage("No character to process", STATUS_MESSAGE_TIMEOUT)
+        elif reason == STOP_STACK_UNDERFLOW:
+            self.statusBar().showMessage("Stack underflow", STATUS_MESSAGE_TIMEOUT)
+        elif reason == STOP_INPUT_EXHAUSTED:
+            self.statusBar().showMessage("No input left", STATUS_MESSAGE_TIMEOUT)
+        self.stop()
+        self.edit_info()
 
     def step(self):
-        char = self.grid.get_cell_data()
+        if self.worker is not None:
+            self.stop()
+        if self.execute_step():
+            self.schedule_edit_info()
+
+    def execute_step(self):
+        char = self.grid.get_cell_data(self.interpreter.y, self.interpreter.x)
         if not char:
-            QMessageBox.warning(self, "Info", "No character to process")
+            self.statusBar().showMessage("No character to process", STATUS_MESSAGE_TIMEOUT)
             self.stop()
             self.edit_info()
-            return
+            return False
         process_result = self.interpreter.process_char(char)
-        if not process_result:
-            QMessageBox.warning(self, "Info", "Invalid character")
+        if process_result is not True:
+            message = "No input left" if char == "I" else "Stack underflow"
+            self.statusBar().showMessage(message, STATUS_MESSAGE_TIMEOUT)
             self.stop()
-            return
-        if self.auto_run:
-            self.current_step += 1
-            self.steps_remaining_label.setText(f'Steps left: {self.current_step} / {self.step_count_total}')
-            if self.current_step >= self.step_count_total:
-                self.stop()
-        self.edit_info()
+            return False
+        return True
 
     def stop(self):
+        stopped = self.worker is not None
+        self.stop_worker()
         self.steps_remaining_label.setText("Done!")
-        self.timer.stop()
         self.auto_run = False
+        if stopped:
+            # The last snapshot of the worker is dropped by apply_snapshot, show the final state instead.
+            self._pending_information = None
+            self.edit_info()
 
     def reset(self):
-        self.interpreter.reset()
+        # A running worker and queued snapshots would carry state from before the reset,
+        # including the decoded output read_interpreter_state reuses by length.
+        self.stop_worker()
+        self.auto_run = False
+        self._pending_information = None
+        with self.interpreter_lock:
+            self.interpreter.reset()
         self.highlight_row = 0
         self.highlight_col = 0
         self.grid.set_highlight_cell(0, 0)
         self.stack1.clear()
         self.stack2.clear()
+        self._last_info = {}
+        self._last_stack1 = None
+        self._last_stack2 = None
         self.edit_info()
 
-    def edit_info(self):
-        information: Dict[str, Any] = self.interpreter.get_information()
-        self.stack1.clear()
-        self.stack2.clear()
-        if information['stack']:
-            for item in reversed(information['stack']):
-                self.stack1.addItem(str(item))
-        if information["addition_stack"]:
-            for item in reversed(information["addition_stack"]):
-                self.stack2.addItem(str(item))
-
-        self.debug_line4.setText(f"Ignore_mode: {information['ignore_mode']}")
-        text = f"Input: {information['input']}"
-        self.debug_line5.setText(text)
-        symbol_index = information["input_pointer"] + 7
-        if symbol_index < len(text):
-            highlighted_text = (
-                    text[:symbol_index] +
-                    f"<span style='background-color: {self.grid.cursor_fill_color}; color: black;'>{text[symbol_index]}</span>" +
-                    text[symbol_index + 1:]
-            )
-            self.debug_line5.setText(highlighted_text)
-            self.debug_line5.setTextFormat(Qt.RichText)
-
-        if information["output"]:
+    def schedule_edit_info(self, information=None):
+        self._pending_information = information
+        if not self._info_dirty:
+            self._info_dirty = True
+            QTimer.singleShot(0, self._flush_info_if_dirty)
+
+    def _flush_info_if_dirty(self):
+        if self._info_dirty:
+            self._info_dirty = False
+            information, self._pending_information = self._pending_information, None
+            self.edit_info(information)
+
+    def edit_info(self, information: Dict[str, Any] | None = None):
+        if information is None:
+            with self.interpreter_lock:
+                information = read_interpreter_state(self.interpreter, self._last_info)
+        if information["stack"] != self._last_stack1:
+            self.fill_stack_list(self.stack1, self._last_stack1, information["stack"])
+            self._last_stack1 = information["stack"]
+        if information["addition_stack"] != self._last_stack2:
+            self.fill_stack_list(self.stack2, self._last_stack2, information["addition_stack"])
+            self._last_stack2 = information["addition_stack"]
+
+        last_info, self._last_info = self._last_info, information
+
+        if information["ignore_mode"] != last_info.get("ignore_mode"):
+            self.debug_line4.setText(f"Ignore_mode: {information['ignore_mode']}")
+        if (information["input"] != last_info.get("input") or
+                information["input_pointer"] != last_info.get("input_pointer")):
+            text = f"Input: {information['input']}"
+            self.debug_line5.setPlainText(text)
+            symbol_index = information["input_pointer"] + 7
+            if symbol_index < len(text):
+                cursor = self.debug_line5.textCursor()
+                cursor.setPosition(symbol_index)
+                cursor.setPosition(symbol_index + 1, QTextCursor.KeepAnchor)
+                cursor.setCharFormat(self._input_highlight_format)
+
+        if information["output"] and information["output"] != last_info.get("output"):
             self.debug_line1.setText(f"Output: {information['output']}")
         if information["position"]:
-            self.debug_line2.setText(f"Cords: {information['position']}")
-            self.grid.set_highlight_cell(information["position"][1], information["position"][0],
-                                         information["ignore_mode"])
-        if information["direction"]:
+            if information["position"] != last_info.get("position"):
+                self.debug_line2.setText(f"Cords: {information['position']}")
+            if (information["position"] != last_info.get("position") or
+                    information["ignore_mode"] != last_info.get("ignore_mode")):
+                self.grid.set_highlight_cell(information["position"][1], information["position"][0],
+                                             information["ignore_mode"])
+        if information["direction"] and information["direction"] != last_info.get("direction"):
             self.debug_line3.setText(f"Direction: {information['direction']}")
 
+    @staticmethod
+    def fill_stack_list(list_widget, old_items, items):
+        # The widget shows the top of the stack first, so only the rows above the
+        # part both stacks share at the bottom have to be replaced.
+        old_items = old_items or []
+        common = 0
+        for old_item, item in zip(old_items, items):
+            if old_item != item:
+                break
+            common += 1
+
+        list_widget.setUpdatesEnabled(False)
+        if common == 0:
+            list_widget.clear()
+        else:
+            for _ in range(len(old_items) - common):
+                list_widget.takeItem(0)
+        list_widget.insertItems(0, [str(item) for item in items[common:][::-1]])
+        list_widget.setUpdatesEnabled(True)
+
     def on_open(self):
         file_name, _ = QFileDialog.getOpenFileName(
             self,
@@ -523,10 +818,7 @@ class MainWindow(QMainWindow):
                 grid_data = grid_map.get_map()
 
                 self.grid.set_grid_size(self.row_spin.value(), self.col_spin.value())
-
-                for row in range(grid_data.shape[0]):
-                    for col in range(grid_data.shape[1]):
-                        self.grid.cells[row][col].setText(grid_data[row][col])
+                self.grid.load(grid_data)
             except Exception as e:
                 QMessageBox.critical(self, "load error", f"Error loading file: {e}")
 
@@ -539,35 +831,48 @@ class MainWindow(QMainWindow):
         )
         if file_name:
             try:
-                rows, cols = self.grid.rows, self.grid.cols
+                text = np.where(self.grid.data == '', ' ', self.grid.data)
+                lines = text.view(f'U{self.grid.cols}').ravel().tolist()
                 with open(file_name, 'w') as file:
-                    for row in range(rows):
-                        line = ''.join([self.grid.cells[row][col].text() or ' ' for col in range(cols)])
-                        file.write(line + '\n')
+                    file.write('\n'.join(lines) + '\n')
             except Exception as e:
                 QMessageBox.critical(self, "export error", f"Error exporting file: {e}")
 
     def open_input_color_dialog(self):
-        self.color_dialog = ColorDialog(self, (
-            self.grid.pointer_outline_color, self.grid.pointer_fill_color, self.grid.cursor_outline_color,
-            self.grid.cursor_fill_color))
+        colors = (self.grid.pointer_outline_color, self.grid.pointer_fill_color, self.grid.cursor_outline_color,
+                  self.grid.cursor_fill_color)
+        if self.color_dialog is None:
+            self.color_dialog = ColorDialog(self, colors)
+        else:
+            self.color_dialog.set_values(colors)
         if self.color_dialog.exec_() == QDialog.Accepted:
             new_values = self.color_dialog.get_values()
             self.update_colors(new_values)
 
     def open_input_dialog(self):
-        self.input_dialog = InputDialog(self, "Input", self.interpreter.get_input())
+        if self.input_dialog is None:
+            self.input_dialog = InputDialog(self, "Input", self.interpreter.get_input())
+        else:
+            self.input_dialog.set_value(self.interpreter.get_input())
         if self.input_dialog.exec_() == QDialog.Accepted:
-            self.interpreter.set_input(self.input_dialog.input_box.text())
+            with self.interpreter_lock:
+                self.interpreter.set_input(self.input_dialog.input_box.text())
         self.edit_info()
 
     def update_colors(self, new_values):
-        self.grid.pointer_outline_color = new_values[0]
-        self.grid.pointer_fill_color = new_values[1]
-        self.grid.cursor_outline_color = new_values[2]
-        self.grid.cursor_fill_color = new_values[3]
+        self.grid.update_colors(new_values)
+        self.update_input_highlight_format()
+        self._last_info = {}
         self.edit_info()
 
+    def update_input_highlight_format(self):
+        self._input_highlight_format.setBackground(QColor(self.grid.cursor_fill_color))
+        self._input_highlight_format.setForeground(QColor("black"))
+
+    def closeEvent(self, event):
+        self.stop_worker()
+        super().closeEvent(event)
+
     def resize_grid(self):
         rows = self.row_spin.value()
         cols = self.col_spin.value()
@@ -18,3 +18,21 @@ TURN_LEFT = {
     (-1, 0): (0, 1),
     (0, 1): (1, 0)
 }
+
+OP_BLANK = 0
+OP_UNKNOWN = 0x7F
+
+DIRECTION_UP, DIRECTION_RIGHT, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_NONE = range(5)
+
+DIRECTION_IDS = {
+    "^": DIRECTION_UP,
+    ">": DIRECTION_RIGHT,
+    "V": DIRECTION_DOWN,
+    "<": DIRECTION_LEFT
+}
+
+DIRECTION_VECTORS = ((0, -1), (1, 0), (0, 1), (-1, 0), (0, 0))
+DIRECTION_IDS_BY_VECTOR = {vector: direction_id for direction_id, vector in enumerate(DIRECTION_VECTORS)}
+
+TURN_RIGHT_IDS = (DIRECTION_RIGHT, DIRECTION_DOWN, DIRECTION_LEFT, DIRECTION_UP)
+TURN_LEFT_IDS = (DIRECTION_LEFT, DIRECTION_UP, DIRECTION_RIGHT, DIRECTION_DOWN)
@@ -3,46 +3,79 @@ from typing import Union, Any
 
 import numpy as np
 
+from deolang.constants import OP_BLANK, OP_UNKNOWN
+
 
 class GridMap:
     def __init__(self, file=None):
         if not file or not os.path.exists(file):
             raise FileNotFoundError("file not found or not specified")
 
-        grid = []
-        temp = []
-
         with open(file, 'r') as map_file:
-            while True:
-                char = map_file.read(1)
-                if not char:
-                    break
-                elif char == '\n':
-                    grid.append(temp)
-                    temp = []
-                elif char == ' ':
-                    temp.append('')
-                else:
-                    temp.append(char)
-
-        if temp:
-            grid.append(temp)
-
-        row_length = len(grid[0])
-        if not all(len(row) == row_length for row in grid):
-            raise ValueError(f"All rows must be of the same length{row_length}")
+            text = map_file.read()
+
+        rows = text.split('\n')
+        if rows[-1] == '':
+            rows.pop()
 
-        self._map = np.array(grid, dtype=str)
-        if self._map.size == 0:
+        row_length = len(rows[0]) if rows else 0
+        if not all(len(row) == row_length for row in rows):
+            raise ValueError(f"All rows must be of the same length{row_length}")
+        if row_length == 0:
             raise ValueError("Map is cannot be empty")
 
+        self._width, self._height = row_length, len(rows)
+        self._cells = ''.join(rows)
+
+        shape = (self._height, self._width)
+        code_points = np.frombuffer(self._cells.encode('utf-32-le'), dtype=np.uint32).reshape(shape)
+        self._padded_opcodes = np.full((self._height + 2, self._width + 2), OP_BLANK, dtype=np.uint8)
+        opcodes = np.minimum(code_points, OP_UNKNOWN)
+        # OP_BLANK is 0, so a NUL character has to be moved out of its way.
+        opcodes[code_points == 0] = OP_UNKNOWN
+        opcodes[code_points == ord(' ')] = OP_BLANK
+        self._padded_opcodes[1:-1, 1:-1] = opcodes
+        self._padded_opcode_rows = None
+
     def get_map(self):
-        return self._map.copy()
+        shape = (self._height, self._width)
+        grid = np.frombuffer(self._cells.encode('utf-32-le'), dtype='<U1').reshape(shape).copy()
+        grid[grid == ' '] = ''
+        return grid
+
+    def get_opcodes(self) -> np.ndarray:
+        """Get the program as a uint8 opcode grid.
+
+        Every cell holds the ASCII code of its instruction, OP_BLANK for empty cells
+        and OP_UNKNOWN for NUL and characters outside of ASCII. The array is a view into
+        get_padded_opcodes, shared, not copied.
+        """
+        return self._padded_opcodes[1:-1, 1:-1]
+
+    def get_padded_opcodes(self) -> np.ndarray:
+        """Get the opcode grid surrounded by a one cell border of OP_BLANK.
+
+        The cell of position (x, y) is at [y + 1, x + 1]. An instruction pointer that
+        starts inside the grid and moves one cell per step reads the border instead
+        of leaving the array, so run loops need no bounds checks.
+        """
+        return self._padded_opcodes
+
+    def get_padded_opcode_rows(self) -> list[list[int]]:
+        """Get get_padded_opcodes as a list of rows of ints.
+
+        Indexing nested lists is much faster than indexing the array from Python code.
+        The lists are built on the first call and shared afterwards, so they must not be modified.
+        """
+        if self._padded_opcode_rows is None:
+            self._padded_opcode_rows = self._padded_opcodes.tolist()
+        return self._padded_opcode_rows
 
     def get_item(self, x: int, y: int) :
-        if x < 0 or y < 0 or x >= self._map.shape[1] or y >= self._map.shape[0]:
+        if x < 0 or y < 0 or x >= self._width or y >= self._height:
             return False
-        return self._map[y, x]
+        char = self._cells[y * self._width + x]
+        return '' if char == ' ' else char
 
     def __len__(self):
-        return self._map.size
\ No newline at end of file
+        return self._width * self._height
\ No newline at end of file
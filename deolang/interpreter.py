@@ -1,12 +1,47 @@
 from __future__ import annotations
 
+import operator
 from typing import Any, Callable
 
+import numpy as np
+
 from deolang.gridmap import GridMap
-from deolang.constants import (TURN_LEFT, TURN_RIGHT, DIRECTIONS)
+from deolang.constants import (DIRECTION_DOWN, DIRECTION_IDS, DIRECTION_IDS_BY_VECTOR, DIRECTION_LEFT,
+                               DIRECTION_NONE, DIRECTION_RIGHT, DIRECTION_UP, DIRECTION_VECTORS, OP_BLANK,
+                               OP_UNKNOWN, TURN_LEFT_IDS, TURN_RIGHT_IDS)
+from deolang.interpreter_jit import (MAX_CODE_POINT, NUMBA_AVAILABLE, OUTPUT_NUMBER, STATUS_HALT, STATUS_OUTPUT_FULL,
+                                     STATUS_STEPS_DONE, run_kernel)
+
+IGNORE_TOGGLE_HORIZONTAL = ord("|")
+IGNORE_TOGGLE_VERTICAL = ord("_")
+KERNEL_MIN_STACK_SIZE = 1024
+KERNEL_OUTPUT_BUFFER_SIZE = 4096
+KERNEL_MIN_STEPS = 16
+NUMBER_BYTES = tuple(str(number).encode("ascii") for number in range(1024))
+MAX_TRACE_LENGTH = 256
+TRACE_COMPILE_HITS = 8
+TRACE_TERMINATORS = frozenset(map(ord, "/\\I"))
+TRACE_FOLD_LIMIT = 2 ** 63 - 1
+TRACE_FOLDABLE = {"+": operator.add, "-": operator.sub, "*": operator.mul, "%": operator.floordiv}
+TRACE_STACK_EFFECTS = {
+    ord("+"): (2, -1, 0, 0),
+    ord("-"): (2, -1, 0, 0),
+    ord("*"): (2, -1, 0, 0),
+    ord("%"): (2, -1, 0, 0),
+    ord("P"): (1, -1, 0, 0),
+    ord("N"): (1, -1, 0, 0),
+    ord("A"): (1, -1, 0, 0),
+    ord("D"): (1, -1, 0, 1),
+    ord("U"): (0, 1, 1, -1),
+    ord("C"): (1, 1, 0, 0),
+}
 
 
 class Interpreter:
+    __slots__ = ("program", "stack", "addition_stack", "output", "x", "y", "direction_id", "ignore_mode",
+                 "input", "input_pointer", "built_in_input", "_traces", "_trace_hits", "_kernel_stack",
+                 "_kernel_addition_stack", "_kernel_output")
+
     def __init__(self, program_input: str | None = None, build_in_input: Callable = None) -> None:
         """Initialize interpreter state.
 
@@ -15,13 +50,25 @@ class Interpreter:
             build_in_input: Optional callable to use for input
         """
         self.program = None
-        self.stack, self.addition_stack, self.output = [], [], []
+        self.stack, self.addition_stack, self.output = [], [], bytearray()
         self.x, self.y = 0, 0
-        self.direction = (0, 0)
+        self.direction_id = DIRECTION_NONE
         self.ignore_mode = False
         self.input = program_input
         self.input_pointer = 0
         self.built_in_input = build_in_input
+        self._traces = {}
+        self._trace_hits = {}
+        self._kernel_stack = self._kernel_addition_stack = self._kernel_output = None
+
+    @property
+    def direction(self) -> tuple[int, int]:
+        """Direction of the instruction pointer as (dx, dy), (0, 0) before the first turn."""
+        return DIRECTION_VECTORS[self.direction_id]
+
+    @direction.setter
+    def direction(self, direction: tuple[int, int]) -> None:
+        self.direction_id = DIRECTION_IDS_BY_VECTOR[direction]
 
     def load_program(self, file: str) -> None:
         """Load program from file into GridMap.
@@ -30,6 +77,8 @@ class Interpreter:
             file: Path to the program file
         """
         self.program = GridMap(file)
+        self._traces = {}
+        self._trace_hits = {}
 
     def run(self, steps: int = 0) -> bool:
         """Execute the program for specified steps or until termination.
@@ -50,18 +99,259 @@ class Interpreter:
         if steps < 0:
             raise ValueError("Program execution steps must be a non-negative integer")
 
-        max_iterations = steps if steps > 0 else float('inf')
+        # Entering the kernel costs a few microseconds, more than a handful of steps in Python.
+        if NUMBA_AVAILABLE and not 0 < steps < KERNEL_MIN_STEPS:
+            return self._run_compiled(steps)
+        return self._run_python(steps)
+
+    def _run_python(self, steps: int) -> bool:
+        """Execute the program in Python, see run.
+
+        Straight runs of instructions are executed by traces generated with
+        _compile_trace, everything else one _process_code call at a time.
+
+        Compiling a trace costs as much as a few hundred steps. Without a step limit
+        or with one above MAX_TRACE_LENGTH it is compiled on the first visit of a
+        position, otherwise only once the position was visited TRACE_COMPILE_HITS
+        times, so short runs like run(1) never pay for it.
+        """
+        remaining = steps if steps > 0 else -1
+        opcodes = self.program.get_opcodes()
+        height, width = opcodes.shape
+        if not (0 <= self.x < width and 0 <= self.y < height):
+            return False
+        opcodes = self.program.get_padded_opcode_rows()
+        get_trace = self._traces.get
+        trace_hits = self._trace_hits
+        compile_trace = self._compile_trace
+        process_code = self._process_code
+        stack, addition_stack, output = self.stack, self.addition_stack, self.output
+
+        while remaining != 0:
+            x, y = self.x, self.y
+            if not self.ignore_mode:
+                key = (x, y, self.direction_id)
+                trace = get_trace(key, False)
+                if trace is False:
+                    if remaining < 0 or remaining >= MAX_TRACE_LENGTH:
+                        trace = self._traces[key] = compile_trace(*key)
+                    elif remaining > 1:
+                        hits = trace_hits[key] = trace_hits.get(key, 0) + 1
+                        if hits >= TRACE_COMPILE_HITS:
+                            trace = self._traces[key] = compile_trace(*key)
+                if (trace and (remaining < 0 or remaining >= trace[1]) and
+                        len(stack) >= trace[2] and len(addition_stack) >= trace[3]):
+                    trace[0](self, stack, addition_stack, output)
+                    if remaining > 0:
+                        remaining -= trace[1]
+                    continue
+
+            code = opcodes[y + 1][x + 1]
+            if code == OP_BLANK or process_code(code) is not True:
+                return False
+            if remaining > 0:
+                remaining -= 1
+
+        return True
+
+    def _compile_trace(self, x: int, y: int, direction_id: int) -> tuple[Callable, int, int, int] | None:
+        """Generate a Python function executing the straight-line path from a position.
 
-        for _ in range(max_iterations):
-            char = self.program.get_item(self.x, self.y)
-            if not char:
-                continue
+        The path follows direction changes and stops in front of a blank cell, the
+        grid border, an instruction that branches or reads input (/, \\, I, a |
+        or _ that would switch ignore mode on), or a position it already visited.
+        Instructions that may raise write the position back first, so an exception
+        leaves the interpreter in the same state as _process_code would.
 
-            result = self.process_char(char)
-            if result is False:
+        Values pushed by the path itself are tracked at compile time, so sequences
+        like digit, digit, + or C, N collapse into a single constant push or a
+        constant output write.
+
+        Args:
+            x: Column of the first instruction
+            y: Row of the first instruction
+            direction_id: Direction when the first instruction is executed
+
+        Returns:
+            Tuple (function, executed steps, stack depth needed, addition stack depth needed)
+            where function takes (interpreter, stack, addition_stack, output),
+            or None if the path is empty
+        """
+        opcodes = self.program.get_opcodes()
+        height, width = opcodes.shape
+        lines = []
+        known = []
+        constant_output = bytearray()
+        length = depth = addition_depth = stack_needed = addition_needed = 0
+        visited = set()
+
+        def flush_known():
+            if len(known) == 1:
+                emit(f"push({known[0]})")
+            elif known:
+                emit(f"stack.extend({tuple(known)})")
+            known.clear()
+
+        def emit(*new_lines):
+            if constant_output:
+                lines.append(f"output += {bytes(constant_output)!r}")
+                constant_output.clear()
+            lines.extend(new_lines)
+
+        while length < MAX_TRACE_LENGTH and (x, y, direction_id) not in visited:
+            if not (0 <= x < width and 0 <= y < height):
+                break
+            code = int(opcodes[y, x])
+            if code == OP_BLANK or code in TRACE_TERMINATORS:
+                break
+            if code == IGNORE_TOGGLE_HORIZONTAL and direction_id in (DIRECTION_LEFT, DIRECTION_RIGHT):
+                break
+            if code == IGNORE_TOGGLE_VERTICAL and direction_id in (DIRECTION_UP, DIRECTION_DOWN):
+                break
+            visited.add((x, y, direction_id))
+
+            if code in TRACE_STACK_EFFECTS:
+                pops, push, addition_pops, addition_push = TRACE_STACK_EFFECTS[code]
+                stack_needed = max(stack_needed, pops - depth)
+                addition_needed = max(addition_needed, addition_pops - addition_depth)
+                depth += push
+                addition_depth += addition_push
+
+            save_state = f"interpreter.x, interpreter.y, interpreter.direction_id = {x}, {y}, {direction_id}"
+            char = chr(code)
+            if char in DIRECTION_IDS:
+                direction_id = DIRECTION_IDS[char]
+            elif char.isdigit():
+                depth += 1
+                known.append(code - ord("0"))
+            elif (char in TRACE_FOLDABLE and len(known) >= 2 and (char != "%" or known[-1] != 0) and
+                  abs(TRACE_FOLDABLE[char](known[-2], known[-1])) <= TRACE_FOLD_LIMIT):
+                value = known.pop()
+                known[-1] = TRACE_FOLDABLE[char](known[-1], value)
+            elif char == "C" and known:
+                known.append(known[-1])
+            elif char == "P" and known:
+                known.pop()
+            elif char == "N" and known:
+                constant_output += str(known.pop()).encode("ascii")
+            elif char == "A" and known and 0 <= known[-1] <= MAX_CODE_POINT:
+                constant_output += chr(known.pop()).encode("utf-8", "surrogatepass")
+            elif char == "D" and known:
+                emit(f"addition_stack.append({known.pop()})")
+            elif char in TRACE_FOLDABLE or char in "PNADUC":
+                flush_known()
+                if char in "+-*":
+                    emit("value = pop()", f"stack[-1] {char}= value")
+                elif char == "%":
+                    emit("value = pop()", "if value == 0:", f"    {save_state}", "    pop() // value",
+                         "stack[-1] //= value")
+                elif char == "P":
+                    emit("pop()")
+                elif char == "N":
+                    emit("value = pop()", "if 0 <= value < 1024:", "    output += NUMBER_BYTES[value]", "else:",
+                         f"    {save_state}", "    output += str(value).encode('ascii')")
+                elif char == "A":
+                    emit("value = pop()", "if 0 <= value < 128:", "    output.append(value)", "else:",
+                         f"    {save_state}", "    output += chr(value).encode('utf-8', 'surrogatepass')")
+                elif char == "D":
+                    emit("addition_stack.append(pop())")
+                elif char == "U":
+                    emit("push(addition_stack.pop())")
+                elif char == "C":
+                    emit("push(stack[-1])")
+
+            dx, dy = DIRECTION_VECTORS[direction_id]
+            x += dx
+            y += dy
+            length += 1
+
+        if length == 0:
+            return None
+        flush_known()
+        emit()
+
+        source = "\n    ".join([
+            "def trace(interpreter, stack, addition_stack, output):",
+            "push = stack.append",
+            "pop = stack.pop",
+            *lines,
+            f"interpreter.x, interpreter.y, interpreter.direction_id = {x}, {y}, {direction_id}",
+        ])
+        namespace = {"NUMBER_BYTES": NUMBER_BYTES}
+        exec(compile(source, "<deolang trace>", "exec"), namespace)
+        return namespace["trace"], length, stack_needed, addition_needed
+
+    def _run_compiled(self, steps: int) -> bool:
+        """Execute the program with the numba kernel, see run.
+
+        Instructions the kernel cannot execute (built-in input, stack underflow, integers
+        outside the int64 range) are handed to process_char one at a time. Once a
+        stack holds a value that does not fit into int64 the remaining steps run
+        in _run_python.
+
+        The kernel buffers are kept between calls and only replaced when a stack
+        outgrows them, so short runs do not pay for allocating them.
+        """
+        remaining = steps if steps > 0 else -1
+        output = self._kernel_output
+        if output is None:
+            output = self._kernel_output = np.empty((KERNEL_OUTPUT_BUFFER_SIZE, 2), dtype=np.int64)
+        if isinstance(self.input, str) and self.input:
+            program_input = np.frombuffer(self.input.encode("utf-32-le", "surrogatepass"),
+                                          dtype=np.uint32).astype(np.int64)
+        else:
+            program_input = np.empty(0, dtype=np.int64)
+
+        while True:
+            stack = self._kernel_stack
+            if stack is None or stack.shape[0] < len(self.stack) + KERNEL_MIN_STACK_SIZE:
+                stack = self._kernel_stack = np.empty(2 * len(self.stack) + KERNEL_MIN_STACK_SIZE, dtype=np.int64)
+            addition_stack = self._kernel_addition_stack
+            if addition_stack is None or addition_stack.shape[0] < len(self.addition_stack) + KERNEL_MIN_STACK_SIZE:
+                addition_stack = self._kernel_addition_stack = np.empty(
+                    2 * len(self.addition_stack) + KERNEL_MIN_STACK_SIZE, dtype=np.int64)
+            try:
+                stack[:len(self.stack)] = self.stack
+                addition_stack[:len(self.addition_stack)] = self.addition_stack
+            except OverflowError:
+                return self._run_python(max(remaining, 0))
+            state = np.array([self.x, self.y, self.direction[0], self.direction[1], self.ignore_mode,
+                              self.input_pointer], dtype=np.int64)
+
+            status = STATUS_OUTPUT_FULL
+            sp, asp = len(self.stack), len(self.addition_stack)
+            while status == STATUS_OUTPUT_FULL:
+                status, executed, sp, asp, out_len = run_kernel(self.program.get_padded_opcodes(), stack, sp,
+                                                                addition_stack, asp, state, program_input,
+                                                                output, remaining)
+                for kind, value in output[:out_len].tolist():
+                    if kind == OUTPUT_NUMBER:
+                        self.output += NUMBER_BYTES[value] if 0 <= value < 1024 else str(value).encode("ascii")
+                    elif value < 128:
+                        self.output.append(value)
+                    else:
+                        self.output += chr(value).encode("utf-8", "surrogatepass")
+                if remaining > 0:
+                    remaining -= executed
+
+            self.stack[:] = stack[:sp].tolist()
+            self.addition_stack[:] = addition_stack[:asp].tolist()
+            self.x, self.y = int(state[0]), int(state[1])
+            self.direction = (int(state[2]), int(state[3]))
+            self.ignore_mode = bool(state[4])
+            self.input_pointer = int(state[5])
+
+            if status == STATUS_STEPS_DONE:
+                return True
+            if status == STATUS_HALT:
                 return False
 
-        return 0 < steps
+            if self.process_char(self.program.get_item(self.x, self.y)) is not True:
+                return False
+            if remaining > 0:
+                remaining -= 1
+                if remaining == 0:
+                    return True
 
     def get_current_char(self) -> str:
         """Retrieve the current character from the program grid at the interpreter's position.
@@ -78,10 +368,12 @@ class Interpreter:
     def get_output(self) -> str:
         """Get accumulated output as string.
 
+        The output is buffered as UTF-8 encoded bytes.
+
         Returns:
-            Concatenated output string
+            Decoded output string
         """
-        return "".join(self.output)
+        return self.output.decode("utf-8", "surrogatepass")
 
     def get_program(self) -> GridMap | None:
         """Get the program grid map.
@@ -108,10 +400,7 @@ class Interpreter:
         Returns:
             Formatted string showing addition stack elements in LIFO order
         """
-        addition_stack_dump = "Addition Stack:\n\n"
-        for item in reversed(self.addition_stack):
-            addition_stack_dump += f"[{item}]\n"
-        return addition_stack_dump
+        return "Addition Stack:\n\n" + "".join(f"[{item}]\n" for item in reversed(self.addition_stack))
 
     def get_input(self) -> str:
         if self.input:
@@ -138,11 +427,17 @@ class Interpreter:
         }
 
     def reset(self) -> None:
-        """Reset interpreter state to initial values."""
-        self.stack, self.addition_stack, self.output, = [], [], []
+        """Reset interpreter state to initial values.
+
+        The stacks and the output buffer are cleared in place instead of being
+        replaced, so references to them stay valid.
+        """
+        self.stack.clear()
+        self.addition_stack.clear()
+        self.output.clear()
         self.ignore_mode, self.input_pointer, self.input = False, 0, ""
         self.x, self.y = 0, 0
-        self.direction = (0, 0)
+        self.direction_id = DIRECTION_NONE
 
     def set_input(self, input_data: str = "", pointer_position: int = 0) -> None:
         """Set input for interpreter."""
@@ -196,68 +491,146 @@ class Interpreter:
         Updates interpreter state (position, direction, stacks) accordingly.
         If in ignore mode, ignore next character in the direction of the interpreter.
         """
+        if char == "" or char is None:
+            return False
+        code = ord(char)
+        return self._process_code(code if 0 < code < OP_UNKNOWN else OP_UNKNOWN)
+
+    def _process_code(self, code: int) -> bool | IndexError:
+        """Execute the instruction with the given opcode, see process_char.
+
+        Args:
+            code: Opcode as stored in GridMap.get_opcodes, never OP_BLANK
+        """
         try:
-            if char == "" or char is None:
-                return False
             if self.ignore_mode:
-                if char in "|_":
+                if code == IGNORE_TOGGLE_HORIZONTAL or code == IGNORE_TOGGLE_VERTICAL:
                     self.ignore_mode = False
-                self.x += self.direction[0]
-                self.y += self.direction[1]
+                dx, dy = DIRECTION_VECTORS[self.direction_id]
+                self.x += dx
+                self.y += dy
                 return True
-            if char in DIRECTIONS:
-                self.direction = DIRECTIONS[char]
-            elif char.isdigit():
-                self.stack.append(int(char))
-            elif char == "+":
-                b = self.stack.pop()
-                a = self.stack.pop()
-                self.stack.append(a + b)
-            elif char == "-":
-                b = self.stack.pop()
-                a = self.stack.pop()
-                self.stack.append(a - b)
-            elif char == "*":
-                b = self.stack.pop()
-                a = self.stack.pop()
-                self.stack.append(a * b)
-            elif char == "%":
-                b = self.stack.pop()
-                a = self.stack.pop()
-                self.stack.append(a // b)
-            elif char == "P":
-                self.stack.pop()
-            elif char == "N":
-                self.output.append(str(self.stack.pop()))
-            elif char == "A":
-                self.output.append(chr(self.stack.pop()))
-            elif char == "D":
-                self.addition_stack.append(self.stack.pop())
-            elif char == "U":
-                self.stack.append(self.addition_stack.pop())
-            elif char == "C":
-                self.stack.append(self.stack[-1])
-            elif char == "I":
-                if self.input == "":
-                    self.stack.append(self.built_in_input())
-                else:
-                    self.stack.append(ord(self.input[self.input_pointer]))
-                    self.input_pointer += 1
-            elif char in "|_":
-                if char == "|" and self.direction in ((-1, 0), (1, 0)):
-                    self.ignore_mode = True
-                elif char == "_" and self.direction in ((0, -1), (0, 1)):
-                    self.ignore_mode = True
-            elif char == "/":
-                val = self.stack.pop()
-                self.direction = TURN_LEFT[self.direction] if val == 0 else TURN_RIGHT[self.direction]
-            elif char == "\\":
-                val = self.stack.pop()
-                self.direction = TURN_RIGHT[self.direction] if val == 0 else TURN_LEFT[self.direction]
+            handler = DISPATCH[code]
+            if handler is not None:
+                handler(self)
         except IndexError as index_error:
             return index_error
 
-        self.x += self.direction[0]
-        self.y += self.direction[1]
+        dx, dy = DIRECTION_VECTORS[self.direction_id]
+        self.x += dx
+        self.y += dy
 
         return True
+
+    @staticmethod
+    def _build_dispatch() -> list[Callable[[Interpreter], None] | None]:
+        """Build the instruction table used by process_char.
+
+        Returns:
+            List indexed by the character code of an instruction, holding the unbound
+            handler for that instruction or None for characters that are no-ops
+        """
+        dispatch: list[Callable[[Interpreter], None] | None] = [None] * 128
+        for char, direction_id in DIRECTION_IDS.items():
+            dispatch[ord(char)] = Interpreter._make_op_direction(direction_id)
+        for digit in "0123456789":
+            dispatch[ord(digit)] = Interpreter._make_op_push(int(digit))
+        dispatch[ord("+")] = Interpreter._op_add
+        dispatch[ord("-")] = Interpreter._op_sub
+        dispatch[ord("*")] = Interpreter._op_mul
+        dispatch[ord("%")] = Interpreter._op_div
+        dispatch[ord("P")] = Interpreter._op_pop
+        dispatch[ord("N")] = Interpreter._op_print_number
+        dispatch[ord("A")] = Interpreter._op_print_char
+        dispatch[ord("D")] = Interpreter._op_save
+        dispatch[ord("U")] = Interpreter._op_restore
+        dispatch[ord("C")] = Interpreter._op_copy
+        dispatch[ord("I")] = Interpreter._op_input
+        dispatch[ord("|")] = Interpreter._op_ignore_horizontal
+        dispatch[ord("_")] = Interpreter._op_ignore_vertical
+        dispatch[ord("/")] = Interpreter._op_turn
+        dispatch[ord("\\")] = Interpreter._op_turn_reversed
+        return dispatch
+
+    @staticmethod
+    def _make_op_direction(direction_id: int) -> Callable[[Interpreter], None]:
+        def op_direction(interpreter: Interpreter) -> None:
+            interpreter.direction_id = direction_id
+        return op_direction
+
+    @staticmethod
+    def _make_op_push(value: int) -> Callable[[Interpreter], None]:
+        def op_push(interpreter: Interpreter) -> None:
+            interpreter.stack.append(value)
+        return op_push
+
+    def _op_add(self) -> None:
+        stack = self.stack
+        b = stack.pop()
+        stack[-1] += b
+
+    def _op_sub(self) -> None:
+        stack = self.stack
+        b = stack.pop()
+        stack[-1] -= b
+
+    def _op_mul(self) -> None:
+        stack = self.stack
+        b = stack.pop()
+        stack[-1] *= b
+
+    def _op_div(self) -> None:
+        stack = self.stack
+        b = stack.pop()
+        a = stack.pop()
+        stack.append(a // b)
+
+    def _op_pop(self) -> None:
+        self.stack.pop()
+
+    def _op_print_number(self) -> None:
+        value = self.stack.pop()
+        self.output += NUMBER_BYTES[value] if 0 <= value < 1024 else str(value).encode("ascii")
+
+    def _op_print_char(self) -> None:
+        value = self.stack.pop()
+        if 0 <= value < 128:
+            self.output.append(value)
+        else:
+            self.output += chr(value).encode("utf-8", "surrogatepass")
+
+    def _op_save(self) -> None:
+        self.addition_stack.append(self.stack.pop())
+
+    def _op_restore(self) -> None:
+        self.stack.append(self.addition_stack.pop())
+
+    def _op_copy(self) -> None:
+        stack = self.stack
+        stack.append(stack[-1])
+
+    def _op_input(self) -> None:
+        if self.input == "":
+            self.stack.append(self.built_in_input())
+        else:
+            self.stack.append(ord(self.input[self.input_pointer]))
+            self.input_pointer += 1
+
+    def _op_ignore_horizontal(self) -> None:
+        if self.direction_id in (DIRECTION_LEFT, DIRECTION_RIGHT):
+            self.ignore_mode = True
+
+    def _op_ignore_vertical(self) -> None:
+        if self.direction_id in (DIRECTION_UP, DIRECTION_DOWN):
+            self.ignore_mode = True
+
+    def _op_turn(self) -> None:
+        direction_id = self.direction_id
+        self.direction_id = TURN_LEFT_IDS[direction_id] if self.stack.pop() == 0 else TURN_RIGHT_IDS[direction_id]
+
+    def _op_turn_reversed(self) -> None:
+        direction_id = self.direction_id
+        self.direction_id = TURN_RIGHT_IDS[direction_id] if self.stack.pop() == 0 else TURN_LEFT_IDS[direction_id]
+
+
+DISPATCH = Interpreter._build_dispatch()
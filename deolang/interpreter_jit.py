@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import numpy as np
+
+from deolang.constants import OP_BLANK
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator used when numba is not installed."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda function: function
+
+
+STATUS_STEPS_DONE = 0
+STATUS_HALT = 1
+STATUS_BAIL = 2
+STATUS_OUTPUT_FULL = 3
+
+OUTPUT_NUMBER = 0
+OUTPUT_CHAR = 1
+
+INT64_MIN = np.iinfo(np.int64).min
+INT64_MAX = np.iinfo(np.int64).max
+# Products below this bound fit into int64 even with the rounding error of the float estimate.
+SAFE_PRODUCT = 2.0 ** 62
+MAX_CODE_POINT = 0x10FFFF
+
+
+@njit(cache=True)
+def run_kernel(opcodes, stack, sp, addition_stack, asp, state, program_input, output, max_steps):
+    """Execute instructions until the program halts or needs the Python interpreter.
+
+    Args:
+        opcodes: uint8 program grid with an OP_BLANK border, as returned by
+                 GridMap.get_padded_opcodes
+        stack: int64 buffer holding the stack, top at sp - 1
+        sp: Number of elements in stack
+        addition_stack: int64 buffer holding the addition stack, top at asp - 1
+        asp: Number of elements in addition_stack
+        state: int64 array [x, y, dx, dy, ignore_mode, input_pointer], updated in place
+        program_input: int64 array with the character codes of the program input,
+                       empty if I has to ask the built-in input
+        output: int64 array of shape (n, 2) receiving (kind, value) output records
+        max_steps: Number of instructions to execute, negative for no limit
+
+    Returns:
+        Tuple (status, executed steps, sp, asp, output length). STATUS_BAIL means the
+        instruction at the current position must be executed by Interpreter.process_char
+        (built-in input, exhausted input, stack underflow, integer overflow, division by zero,
+        full stack buffers).
+    """
+    height, width = opcodes.shape[0] - 2, opcodes.shape[1] - 2
+    x, y, dx, dy, ignore_mode, input_pointer = state[0], state[1], state[2], state[3], state[4], state[5]
+    out_len = 0
+    executed = 0
+    status = STATUS_STEPS_DONE
+    if x < 0 or y < 0 or x >= width or y >= height:
+        return STATUS_HALT, executed, sp, asp, out_len
+
+    # The pointer moves one cell per step, so it reaches the OP_BLANK border
+    # before it can leave the array.
+    while executed != max_steps:
+        op = opcodes[y + 1, x + 1]
+        if op == OP_BLANK:
+            status = STATUS_HALT
+            break
+
+        if ignore_mode:
+            if op == 124 or op == 95:  # | _
+                ignore_mode = 0
+        elif op == 94:  # ^
+            dx, dy = 0, -1
+        elif op == 62:  # >
+            dx, dy = 1, 0
+        elif op == 60:  # <
+            dx, dy = -1, 0
+        elif op == 86:  # V
+            dx, dy = 0, 1
+        elif 48 <= op <= 57:  # 0-9
+            if sp == stack.shape[0]:
+                status = STATUS_BAIL
+                break
+            stack[sp] = op - 48
+            sp += 1
+        elif op == 43 or op == 45 or op == 42 or op == 37:  # + - * %
+            if sp < 2:
+                status = STATUS_BAIL
+                break
+            a = stack[sp - 2]
+            b = stack[sp - 1]
+            # numba marks integer arithmetic as non-wrapping, so overflow is
+            # ruled out before computing instead of detected on the result.
+            if op == 43:
+                if (b > 0 and a > INT64_MAX - b) or (b < 0 and a < INT64_MIN - b):
+                    status = STATUS_BAIL
+                    break
+                result = a + b
+            elif op == 45:
+                if (b < 0 and a > INT64_MAX + b) or (b > 0 and a < INT64_MIN + b):
+                    status = STATUS_BAIL
+                    break
+                result = a - b
+            elif op == 42:
+                if abs(float(a) * float(b)) >= SAFE_PRODUCT:
+                    status = STATUS_BAIL
+                    break
+                result = a * b
+            else:
+                if b == 0 or (a == INT64_MIN and b == -1):
+                    status = STATUS_BAIL
+                    break
+                result = a // b
+            stack[sp - 2] = result
+            sp -= 1
+        elif op == 80:  # P
+            if sp == 0:
+                status = STATUS_BAIL
+                break
+            sp -= 1
+        elif op == 78 or op == 65:  # N A
+            if sp == 0 or (op == 65 and not 0 <= stack[sp - 1] <= MAX_CODE_POINT):
+                status = STATUS_BAIL
+                break
+            if out_len == output.shape[0]:
+                status = STATUS_OUTPUT_FULL
+                break
+            sp -= 1
+            output[out_len, 0] = OUTPUT_NUMBER if op == 78 else OUTPUT_CHAR
+            output[out_len, 1] = stack[sp]
+            out_len += 1
+        elif op == 68:  # D
+            if sp == 0 or asp == addition_stack.shape[0]:
+                status = STATUS_BAIL
+                break
+            sp -= 1
+            addition_stack[asp] = stack[sp]
+            asp += 1
+        elif op == 85:  # U
+            if asp == 0 or sp == stack.shape[0]:
+                status = STATUS_BAIL
+                break
+            asp -= 1
+            stack[sp] = addition_stack[asp]
+            sp += 1
+        elif op == 67:  # C
+            if sp == 0 or sp == stack.shape[0]:
+                status = STATUS_BAIL
+                break
+            stack[sp] = stack[sp - 1]
+            sp += 1
+        elif op == 73:  # I
+            if input_pointer >= program_input.shape[0] or sp == stack.shape[0]:
+                status = STATUS_BAIL
+                break
+            stack[sp] = program_input[input_pointer]
+            sp += 1
+            input_pointer += 1
+        elif op == 124:  # |
+            if dy == 0 and dx != 0:
+                ignore_mode = 1
+        elif op == 95:  # _
+            if dx == 0 and dy != 0:
+                ignore_mode = 1
+        elif op == 47 or op == 92:  # / \
+            if sp == 0 or (dx == 0 and dy == 0):
+                status = STATUS_BAIL
+                break
+            sp -= 1
+            if (stack[sp] == 0) == (op == 47):
+                dx, dy = dy, -dx
+            else:
+                dx, dy = -dy, dx
+
+        x += dx
+        y += dy
+        executed += 1
+
+    state[0], state[1], state[2], state[3], state[4], state[5] = x, y, dx, dy, ignore_mode, input_pointer
+    return status, executed, sp, asp, out_len
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from deolang.interpreter import Interpreter
+
+STOP_DONE = "done"
+STOP_INPUT_EXHAUSTED = "input_exhausted"
+STOP_NEEDS_INPUT = "needs_input"
+STOP_NO_CHARACTER = "no_character"
+STOP_STACK_UNDERFLOW = "stack_underflow"
+
+
+def run_batch(interpreter: Interpreter, get_char: Callable[[int, int], str], steps: int,
+              stop_on_input: bool = False) -> tuple[int, str]:
+    """Execute up to the given number of instructions.
+
+    This loop is kept free of GUI calls so that front ends only have to render
+    the interpreter state after a batch, and so that it stays a plain Python loop
+    PyPy can trace.
+
+    Args:
+        interpreter: Interpreter to advance
+        get_char: Callable returning the character at (x, y), empty for blank or out-of-bounds cells.
+                  Interpreter.program.get_item can be passed directly.
+        steps: Maximum number of instructions to execute
+        stop_on_input: Stop in front of an I instruction that would call the built-in input,
+                       an I skipped by ignore mode does not count
+
+    Returns:
+        Tuple of the number of executed instructions and the reason the batch stopped
+        (STOP_DONE, STOP_NO_CHARACTER, STOP_STACK_UNDERFLOW, STOP_INPUT_EXHAUSTED or STOP_NEEDS_INPUT)
+    """
+    process_char = interpreter.process_char
+    for executed in range(steps):
+        char = get_char(interpreter.x, interpreter.y)
+        if not char:
+            return executed, STOP_NO_CHARACTER
+        if stop_on_input and char == "I" and interpreter.input == "" and not interpreter.ignore_mode:
+            return executed, STOP_NEEDS_INPUT
+        result = process_char(char)
+        if result is not True:
+            # process_char only returns False for an empty character, handled above, so
+            # this is an IndexError. I only pushes, so for I it means the input ran out.
+            return executed, STOP_INPUT_EXHAUSTED if char == "I" else STOP_STACK_UNDERFLOW
+    return steps, STOP_DONE
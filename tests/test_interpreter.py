@@ -0,0 +1,138 @@
+"""Differential tests for the fast execution paths of Interpreter.
+
+Interpreter.run (the numba kernel when it is installed) and Interpreter._run_python
+(generated traces) must leave the interpreter in exactly the state that stepping
+through process_char one instruction at a time produces.
+"""
+import os
+import random
+import tempfile
+import unittest
+
+from deolang.interpreter import Interpreter
+
+RANDOM_CHARACTERS = "^>V<0123456789+-*%PNADUCI|_/\\.  "
+RANDOM_PROGRAMS = 300
+RANDOM_STEPS = 400
+BUILT_IN_INPUT = 66
+LOOP_PROGRAM = ">1PV\n^..<"
+# Eight cells, plus the first cell before the instruction pointer has a direction.
+LOOP_TRACE_KEYS = 9
+
+PROGRAMS = {
+    "addition overflow": ">9C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*N",
+    "subtraction overflow": ">09C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*C*-C+C+N",
+    "multiplication overflow and back": ">99*C*C*C*C*C*C*C*C*C*99*C*C*C*C*C*%N",
+    "int64 minimum": ">09C*C*C*C*C*C*C*C*C*C*-CC*%N",
+    "division by zero": ">10%N",
+    "floor division": ">07-2%N72-%N",
+    "character above 127": ">99*9*A92*9*9*8*A",
+    "surrogate character": ">88*8*8*C+C+C+C+C+C+C+C+A",
+    "negative character": ">01-A",
+    "character above maximum code point": ">99*C*C*C*C*A",
+    "input": ">IIINNN",
+    "input exhausted": ">IIIIINNN",
+    "stack underflow": ">1+N",
+    "addition stack underflow": ">1DUUN",
+    "ignore mode": ">1|2|3_NNN",
+    "nul character": ">1\x001N",
+    "loop": ">1C+CNV\n^P/C9-<",
+}
+
+
+def state(interpreter):
+    return (bytes(interpreter.output), list(interpreter.stack), list(interpreter.addition_stack),
+            interpreter.x, interpreter.y, interpreter.direction, interpreter.ignore_mode, interpreter.input_pointer)
+
+
+def step_through(interpreter, steps):
+    """Reference implementation of Interpreter.run built on process_char."""
+    executed = 0
+    while steps == 0 or executed < steps:
+        char = interpreter.get_current_char()
+        if not char or interpreter.process_char(char) is not True:
+            return False
+        executed += 1
+    return True
+
+
+def execute(run, interpreter, batches):
+    results = []
+    try:
+        for steps in batches:
+            results.append(run(interpreter, steps))
+    except Exception as error:
+        results.append(type(error))
+    return results, state(interpreter)
+
+
+class CountingInterpreter(Interpreter):
+    """Interpreter counting the traces it compiles."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compiled_traces = 0
+
+    def _compile_trace(self, x, y, direction_id):
+        self.compiled_traces += 1
+        return super()._compile_trace(x, y, direction_id)
+
+
+class InterpreterRunTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def new_interpreter(self, source, program_input, interpreter_class=Interpreter):
+        path = os.path.join(self.directory.name, "program.txt")
+        with open(path, "w", encoding="utf-8") as program_file:
+            program_file.write(source)
+        interpreter = interpreter_class(program_input, lambda: BUILT_IN_INPUT)
+        interpreter.load_program(path)
+        return interpreter
+
+    def assert_same_execution(self, source, batches):
+        for program_input in ("", "abé\U0001F600"):
+            expected = execute(step_through, self.new_interpreter(source, program_input), batches)
+            for name, run in (("run", Interpreter.run), ("_run_python", Interpreter._run_python)):
+                with self.subTest(source=source, program_input=program_input, batches=batches, path=name):
+                    self.assertEqual(execute(run, self.new_interpreter(source, program_input), batches), expected)
+
+    def test_programs(self):
+        for source in PROGRAMS.values():
+            self.assert_same_execution(source, [0])
+            self.assert_same_execution(source, [1, 2, 3, 5, 8, 13, 21, 34, 55])
+
+    def test_random_programs(self):
+        generator = random.Random(0)
+        for _ in range(RANDOM_PROGRAMS):
+            height, width = generator.randint(1, 6), generator.randint(1, 10)
+            rows = ["".join(generator.choice(RANDOM_CHARACTERS) for _ in range(width)) for _ in range(height)]
+            rows[0] = generator.choice(">V") + rows[0][1:]
+            source = "\n".join(rows)
+            self.assert_same_execution(source, [RANDOM_STEPS])
+            self.assert_same_execution(source, [generator.randint(1, 40) for _ in range(10)])
+
+    def test_short_runs_do_not_compile_traces(self):
+        interpreter = self.new_interpreter(LOOP_PROGRAM, "", CountingInterpreter)
+        for _ in range(1000):
+            self.assertTrue(interpreter.run(1))
+        self.assertEqual(interpreter.compiled_traces, 0)
+
+        interpreter = self.new_interpreter(LOOP_PROGRAM, "", CountingInterpreter)
+        for _ in range(1000):
+            self.assertTrue(interpreter._run_python(5))
+        self.assertLessEqual(interpreter.compiled_traces, LOOP_TRACE_KEYS)
+
+    def test_long_runs_compile_traces_once(self):
+        interpreter = self.new_interpreter(LOOP_PROGRAM, "", CountingInterpreter)
+        for _ in range(10):
+            self.assertTrue(interpreter._run_python(1000))
+        self.assertGreater(interpreter.compiled_traces, 0)
+        self.assertLessEqual(interpreter.compiled_traces, LOOP_TRACE_KEYS)
+
+
+if __name__ == "__main__":
+    unittest.main()